@@ -1,8 +1,8 @@
 #!/usr/bin/env python
 
 import argparse
-import json
 import sys
+from programs import add_eager_argument, children, load_programs
 
 
 def get_args():
@@ -11,12 +11,13 @@ def get_args():
     parser.add_argument('-x', '--xyz', default=False, action='store_true')
     parser.add_argument('-d', '--no_dummy', default=False, action='store_true',
                         help="Do not print dummy atoms")
+    add_eager_argument(parser)
     args = parser.parse_args()
     return args
 
 
 def distance_AU_to_A(mol_c4):
-    au2A = 0.529177  # from Google, TODO: find more authorative version
+    au2A = 0.529177210903  # Bohr radius in Å, CODATA 2018
     mol_xyz = mol_c4.copy()
     for atom in mol_xyz:
         atom['Coordinates'] = [pos * au2A for pos in atom['Coordinates']]
@@ -30,19 +31,24 @@ def trim_non_atoms(mol):
 def print_xyz_geometry(geometry):
     mol_xyz = distance_AU_to_A(geometry['geometry a.u.'])
 
-    # First line of xyz file has to list number of atoms presnt in the moleucle
-    print(len(mol_xyz))
-    # Second line of xyz filetype is saved for a comment
-    print(f"QCOMP from lines {geometry['output lines']}")
+    lines = [
+        # First line of xyz file has to list number of atoms presnt in the
+        # moleucle
+        f"{len(mol_xyz)}\n",
+        # Second line of xyz filetype is saved for a comment
+        f"QCOMP from lines {geometry['output lines']}\n",
+    ]
+    atom_line = "{:2s} {:-12.6f} {:-12.6f} {:-12.6f}\n"
     for atom in mol_xyz:
-        print(f"{atom['Z-matrix Symbol']:2s}", end='')
-        for i in atom['Coordinates']:
-            print(f" {i:-12.6f}", end='')
-        print("")
+        lines.append(atom_line.format(atom['Z-matrix Symbol'],
+                                      *atom['Coordinates']))
+    sys.stdout.write(''.join(lines))
 
 
-def get_all_geometries(cfour):
+def get_all_geometries(programs):
     """
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns a list. One geometry for every xjoda section that lists the
     computational geometry (QCOMP) section.
 
@@ -85,22 +91,17 @@ def get_all_geometries(cfour):
     """
     # A single CFOUR job can list more than one geometry, e.g., optimization
     geometries = list()
-    for program in cfour:
-        if program['name'] != 'xjoda':
-            continue
-
+    for program in programs.get('xjoda', []):
         exit_code = program['data']['exit status']
         if exit_code != 0:
             print(f"Warning: xjoda finished with exit code {exit_code}",
                   file=sys.stderr)
 
-        for section in program['sections']:
-            if section['name'] == 'qcomp':
-                geometries += [{
-                    'geometry a.u.': section['data']['geometry a.u.'],
-                    'output lines': f"{section['start']} – {section['end']}",
-                }]
-                continue
+        for section in children(program, 'qcomp'):
+            geometries.append({
+                'geometry a.u.': section['data']['geometry a.u.'],
+                'output lines': f"{section['start']} – {section['end']}",
+            })
 
     return geometries
 
@@ -113,10 +114,9 @@ def trim_dummy_atoms(geo):
 
 def main():
     args = get_args()
-    with open(args.xcfour, 'r') as cfour_json:
-        cfour = json.load(cfour_json)
+    programs = load_programs(args.xcfour, {'xjoda'}, args.eager)
 
-    geometries = get_all_geometries(cfour)
+    geometries = get_all_geometries(programs)
     if len(geometries) == 0:
         print("Warning: no geometries detected in the output file.",
               file=sys.stderr)
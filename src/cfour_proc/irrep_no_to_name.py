@@ -1,6 +1,20 @@
 #!/usr/bin/env python3
 
 import sys
+from programs import SCF_RUNS, children, collect_point_group
+
+# Number of irreps in each of the computational point groups, i.e., in D2h and
+# its subgroups.
+IRREPS_COUNT = {
+    'c1': 1,
+    'cs': 2,
+    'ci': 2,
+    'c2': 2,
+    'c2v': 4,
+    'c2h': 4,
+    'd2': 4,
+    'd2h': 8,
+}
 
 
 def add_irrep(mo, irrep_no_to_name):
@@ -24,8 +38,9 @@ For some MOs the symmetry label is only partial or completely missing: e.g.
 
 The self-consistency checks were commented out.
   """
-    name = mo['compsymm']['name']
-    no = mo['compsymm']['#']
+    compsymm = mo['compsymm']
+    name = compsymm['name']
+    no = compsymm['#']
 
     # if no in irrep_no_to_name:
     #     if name != irrep_no_to_name[no]:
@@ -36,46 +51,60 @@ The self-consistency checks were commented out.
     # else:
     #     irrep_no_to_name[no] = name
 
-    if no not in irrep_no_to_name:
-        irrep_no_to_name[no] = name
+    irrep_no_to_name.setdefault(no, name)
 
 
-def get_irrep_no_to_name(cfour):
+def get_irrep_no_to_name(programs):
     """
-    `cfour`: parsed CFOUR's output
+    `programs`: parsed CFOUR's output indexed with `index_programs`
 
     Returns:
         irrep_no_to_name: a dictionary that keeps irrep's # as keys
         and returns irrep's names (str) as values.
+
+    The listing of MOs is read only until every irrep of the computational
+    point group has its name. Without the point group the whole listing is
+    read. A warning is printed for every listing of MOs with errors, also for
+    the listings that are not read.
     """
 
     irrep_no_to_name = dict()
-
-    for program in cfour:
-        if program['name'] == 'xvscf' or program['name'] == 'xdqcscf':
-            for section in program['sections']:
-                if section['name'] == 'MOs':
-                    if section['metadata']['ok'] is False:
-                        print("Warning: Listing of MOs contains errors. Irrep"
-                              " names might be incorrect. (low risk)",
-                              file=sys.stderr)
-                    for mo in section['data']['occupied']:
-                        add_irrep(mo, irrep_no_to_name)
-                    for mo in section['data']['virtual']:
-                        add_irrep(mo, irrep_no_to_name)
+    point_group = collect_point_group(programs, warn=False)
+    n_irreps = IRREPS_COUNT.get(point_group.lower())
+
+    mos_sections = [
+        section
+        for program in programs.get(SCF_RUNS, [])
+        for section in children(program, 'MOs')
+    ]
+    # Every listing is checked, also those after the early return below.
+    for section in mos_sections:
+        if section['metadata']['ok'] is False:
+            print("Warning: Listing of MOs contains errors. Irrep"
+                  " names might be incorrect. (low risk)",
+                  file=sys.stderr)
+
+    for section in mos_sections:
+        for mos in (section['data']['occupied'],
+                    section['data']['virtual']):
+            for mo in mos:
+                add_irrep(mo, irrep_no_to_name)
+                if len(irrep_no_to_name) == n_irreps:
+                    return irrep_no_to_name
 
     return irrep_no_to_name
 
 
 def main():
     import argparse
-    import json
+    from programs import add_eager_argument, load_programs
     parser = argparse.ArgumentParser()
     parser.add_argument('cfour')
+    add_eager_argument(parser)
     args = parser.parse_args()
-    with open(args.cfour) as cfour_json:
-        cfour = json.load(cfour_json)
-    irrep_no_to_name = get_irrep_no_to_name(cfour)
+    programs = load_programs(args.cfour, {'xjoda', 'xvscf', 'xdqcscf'},
+                             args.eager)
+    irrep_no_to_name = get_irrep_no_to_name(programs)
     for no, name in irrep_no_to_name.items():
         print(f"{no:2d}: {name}")
 
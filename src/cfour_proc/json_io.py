@@ -0,0 +1,39 @@
+import sys
+
+# orjson is much faster than the standard library on the large parsed CFOUR
+# outputs, but it is optional. Fall back to json if it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def load_json(path):
+    """ Reads the JSON file `path`, e.g., a parsed CFOUR output. """
+    if orjson is not None:
+        with open(path, 'rb') as json_file:
+            return orjson.loads(json_file.read())
+
+    with open(path, 'r') as json_file:
+        return json.load(json_file)
+
+
+def print_json(data) -> None:
+    """ Prints `data` as a single line of JSON to the standard output. """
+    if orjson is None:
+        print(json.dumps(data))
+        return
+
+    dumped = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+    # A replaced standard output, e.g. io.StringIO, accepts only text.
+    if not hasattr(sys.stdout, 'buffer'):
+        sys.stdout.write(dumped.decode() + '\n')
+        return
+
+    # Text printed so far has to reach the output before the raw bytes do.
+    sys.stdout.flush()
+    sys.stdout.buffer.write(dumped)
+    sys.stdout.buffer.write(b'\n')
+    sys.stdout.buffer.flush()
@@ -1,5 +1,4 @@
 import argparse
-import shutil
 import os
 from pathlib import Path
 
@@ -14,28 +13,25 @@ parser = argparse.ArgumentParser()
 parser.add_argument('ZMATnew')
 args = parser.parse_args()
 
+# Translation table that removes the `*` symbols
+NO_STARS = {ord('*'): None}
+
 
 log(f"""Optimized geometry file comes from:
     `{os.path.abspath(args.ZMATnew)}`""")
 
 
-shutil.copy2(src=args.ZMATnew, dst='.')
-cwd = Path('.')
-(cwd / 'ZMATnew').rename(target=(cwd / 'ZMAT.tmp'))
-log("ZMATnew renamed to ZMAT.tmp")
-
-
 old_zmat = dict()
-with open('ZMAT.tmp', 'r', encoding='utf-8') as zmattmp:
-    old_zmat['comment'] = next(zmattmp)
+with open(args.ZMATnew, 'r', encoding='utf-8') as zmatnew:
+    old_zmat['comment'] = next(zmatnew)
     old_zmat['geometry'] = list()
-    for line in zmattmp:
+    for line in zmatnew:
         if line.strip() == '':
             break
-        old_zmat['geometry'].append(line.replace('*', ''))
+        old_zmat['geometry'].append(line.translate(NO_STARS))
 
     old_zmat['reminder'] = list()
-    for line in zmattmp:
+    for line in zmatnew:
         old_zmat['reminder'].append(line)
 
 log('Removed `*` symbols from the geometry specification (Z-matrix).')
@@ -48,20 +44,15 @@ log('Removed `*` symbols from the geometry specification (Z-matrix).')
 # TODO: consider specifying the FINDIFF keywords: FD_CALCTYPE, FD_STEPSIZE,
 #       FD_PROJECT, and FD_IRREPS
 
-with open('ZMAT', 'w', encoding='utf-8') as zmat_file:
+findiff = Path('findiff')
+findiff.mkdir(exist_ok=True)
+log('Created a "findiff" directory.')
+
+with open(findiff / 'ZMAT', 'w', encoding='utf-8') as zmat_file:
     zmat_file.write(old_zmat['comment'])
     for line in old_zmat['geometry']:
         zmat_file.write(line)
     zmat_file.write('\n')
     for line in old_zmat['reminder']:
         zmat_file.write(line)
-log('Edited file saved to ZMAT.')
-
-(cwd / 'ZMAT.tmp').unlink()
-log('Removed the "ZMAT.tmp" file.')
-
-(cwd / 'findiff').mkdir()
-log('Created a "findiff" directory.')
-
-(cwd / 'ZMAT').rename(target=(cwd / 'findiff' / 'ZMAT'))
-log('Moved the "ZMAT" file to the "findiff" directory.')
+log('Edited file saved to "findiff/ZMAT".')
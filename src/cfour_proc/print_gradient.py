@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import sys
+from json_io import print_json
+from programs import add_eager_argument, children, load_programs
 from print_roots import collect_eom_roots_xncc
 from print_roots_xvee import collect_eom_roots_xvee
 
@@ -13,6 +14,9 @@ from print_roots_xvee import collect_eom_roots_xvee
 SINGLE_THRESHOLD = 0.1
 DOUBLE_THRESHOLD = 0.1
 
+# Programs of the CFOUR output that are read by this script.
+PROGRAMS = {'xjoda', 'xncc', 'xvee'}
+
 
 def get_args():
     parser = argparse.ArgumentParser()
@@ -21,6 +25,7 @@ def get_args():
                         help="Print normal coordinates gradient in json.")
     parser.add_argument('-v', '--verbose', default=0, action='count',
                         help="Print a summary to stdandard output.")
+    add_eager_argument(parser)
     args = parser.parse_args()
     return args
 
@@ -73,59 +78,53 @@ def get_args():
 #     return roots
 
 
-def collect_gradient(cfour):
+def collect_gradient(programs):
     """
     Extracts normal coordinate gradient.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
         gradient: list()
     """
-    last_xjoda = None
-
-    for program in cfour:
-        if program['name'] == 'xjoda':
-            last_xjoda = program
+    last_xjoda = programs['xjoda'][-1]
 
     gradient = list()
-    for section in last_xjoda['sections']:
-        if section['name'] != 'normal coordinate gradient':
-            continue
-
+    for section in children(last_xjoda, 'normal coordinate gradient'):
         if 'Normal Coordinate Gradient' not in section['data']:
             print("Error: Normal coordinate gradient missing in xjoda.",
                   file=sys.stderr)
             return []
 
         for component in section['data']['Normal Coordinate Gradient']:
-            gradient += [{
+            gradient.append({
                 'mode #': component['mode #'],
                 'frequency, cm-1': component['omega'],
                 'gradient, cm-1': component['dE/dQ, cm-1'],
-                }]
+                })
 
     return gradient
 
 
 def main():
     args = get_args()
-    with open(args.cfour_file, 'r') as cfour_file_input:
-        cfour = json.load(cfour_file_input)
+    programs = load_programs(args.cfour_file, PROGRAMS, args.eager)
 
-    xncc_roots = collect_eom_roots_xncc(cfour)
-    xvee_roots = collect_eom_roots_xvee(cfour)
+    xncc_roots = collect_eom_roots_xncc(programs)
+    xvee_roots = collect_eom_roots_xvee(programs)
     if len(xncc_roots) == 0 and len(xvee_roots) == 0:
         print("Warning: No EOM roots detected in the gradient calculation",
               file=sys.stderr)
-    roots = xncc_roots + xvee_roots
+    roots = xncc_roots + [root.to_dict() for root in xvee_roots]
 
-    gradient = collect_gradient(cfour)
+    gradient = collect_gradient(programs)
     outpack = {
         'gradient': gradient,
         'EOM states': roots,
     }
 
     if args.json is True:
-        print(json.dumps(outpack))
+        print_json(outpack)
 
     if args.verbose > 0:
         print("EOM root(s) related to the gradient:")
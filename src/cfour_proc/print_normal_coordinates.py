@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import sys
 from geometry import get_all_geometries, distance_AU_to_A, trim_non_atoms
+from json_io import print_json
+from programs import (add_eager_argument, children, collect_point_group,
+                      load_programs)
 
 GROUP_ORDER = {
     'c2v': {
@@ -50,70 +52,26 @@ def get_args():
                         help="Print normal coordinates in the xyz format (jmol"
                              " can display it). Geometry in Å, mode in"
                         " dimensionless normal coordinates.")
+    add_eager_argument(parser)
     args = parser.parse_args()
     return args
 
 
-def collect_point_group(cfour) -> str:
+def collect_normal_coordinates(programs) -> list:
     """
     Extracts normal coordinates.
 
-    Returns:
-        point_group (str): Computational point group listed in the first xjoda.
-        Returns empty string if error.
-    """
-    first_xjoda = None
-
-    for program in cfour:
-        if program['name'] == 'xjoda':
-            first_xjoda = program
-            break
-
-    if first_xjoda is None:
-        print("Error: xjoda section is missing. Cannot get point group.",
-              file=sys.stderr)
-        return ""
-
-    point_group = None
-    for section in first_xjoda['sections']:
-        if section['name'] != 'point group':
-            continue
-
-        if section['metadata']['ok'] is False:
-            print("Error: Point group section of xjoda is corrupted."
-                  "Point group might be invalid.",
-                  file=sys.stderr)
-
-        data = section['data']
-        if 'computational point group' in data:
-            point_group = data['computational point group']
-
-    if point_group is None:
-        print("Error: Cannot collect the point group from xjoda.",
-              file=sys.stderr)
-        point_group = ""
-
-    return point_group
-
-
-def collect_normal_coordinates(cfour) -> list:
-    """
-    Extracts normal coordinates.
+    `programs`: parsed CFOUR's output indexed with `index_programs`
 
     Returns:
         normal_coordinates: list()
-    """
-    last_xjoda = None
 
-    for program in cfour:
-        if program['name'] == 'xjoda':
-            last_xjoda = program
+    Every mode gets also the 'kind_title' key: its 'kind' ready for printing.
+    """
+    last_xjoda = programs['xjoda'][-1]
 
     normal_coordinates = None
-    for section in last_xjoda['sections']:
-        if section['name'] != 'normal coordinates':
-            continue
-
+    for section in children(last_xjoda, 'normal coordinates'):
         if 'normal coordinates' not in section['data']:
             print("Error: Normal coordinates of xjoda is missing data.",
                   file=sys.stderr)
@@ -124,6 +82,10 @@ def collect_normal_coordinates(cfour) -> list:
     if normal_coordinates is None:
         print("Warrning: Normal coordinates missing in xjoda.",
               file=sys.stderr)
+        return normal_coordinates
+
+    for mode in normal_coordinates:
+        mode['kind_title'] = mode['kind'].title()
 
     return normal_coordinates
 
@@ -133,16 +95,16 @@ def xsim_input_normal_coordinates(normal_coordinates):
     Change the formating of the 'coordinate' part of every entry.
     """
 
-    xsim_ncs = []
-    for normal_coordinate in normal_coordinates:
-        coordinate = [[nc['x'], nc['y'], nc['z']]
-                      for nc in normal_coordinate['coordinate']]
-        xsim_ncs += [{
+    xsim_ncs = [
+        {
             'symmetry': normal_coordinate['symmetry'],
             'frequency, cm-1': normal_coordinate['frequency, cm-1'],
             'kind': normal_coordinate['kind'],
-            'coordinate': coordinate,
-        }]
+            'coordinate': [[nc['x'], nc['y'], nc['z']]
+                           for nc in normal_coordinate['coordinate']],
+        }
+        for normal_coordinate in normal_coordinates
+    ]
 
     return xsim_ncs
 
@@ -161,31 +123,32 @@ def sort_Mulliken(point_group, mode):
 
 
 def verbose_print(args, point_group: str, normal_coordinates) -> None:
-    print(f"Computational point group: {point_group}")
-    print("Normal Coordinates:")
+    lines = [
+        f"Computational point group: {point_group}\n",
+        "Normal Coordinates:\n",
+    ]
+    mode_line = "{:>3d}: {:3} {},{:-8.2f}\n"
+    atom_line = "{:>3s}  {:-7.4f} {:-7.4f} {:-7.4f}\n"
     for id, mode in enumerate(normal_coordinates):
         print_id = id
         if args.Mulliken is True:
             print_id += 1
-        print(f"{print_id:>3d}:"
-              f" {mode['symmetry']:3}"
-              f" {mode['kind'].title()},"
-              f"{mode['frequency, cm-1']:-8.2f}")
+        lines.append(mode_line.format(print_id, mode['symmetry'],
+                                      mode['kind_title'],
+                                      mode['frequency, cm-1']))
         if args.verbose > 1:
             for xyz in mode['coordinate']:
-                print(f"{xyz['atomic symbol']:>3s} ", end='')
-                for idx in ['x', 'y', 'z']:
-                    print(f" {xyz[idx]:-7.4f}", end='')
-                print("")
+                lines.append(atom_line.format(xyz['atomic symbol'],
+                                              xyz['x'], xyz['y'], xyz['z']))
+    sys.stdout.write(''.join(lines))
 
 
 def main():
     args = get_args()
-    with open(args.cfour_file, 'r') as cfour_file_input:
-        cfour = json.load(cfour_file_input)
+    programs = load_programs(args.cfour_file, {'xjoda'}, args.eager)
 
-    point_group = collect_point_group(cfour)
-    normal_coordinates = collect_normal_coordinates(cfour)
+    point_group = collect_point_group(programs)
+    normal_coordinates = collect_normal_coordinates(programs)
 
     if args.Mulliken is True:
         normal_coordinates.sort(key=lambda x: sort_Mulliken(point_group, x))
@@ -194,42 +157,49 @@ def main():
 
     if args.json is True:
         xsim_ncs = xsim_input_normal_coordinates(normal_coordinates)
-        print(json.dumps(xsim_ncs))
+        print_json(xsim_ncs)
 
     if args.verbose > 0:
         verbose_print(args, point_group, normal_coordinates)
 
     if args.xyz is True:
 
-        geo_au = get_all_geometries(cfour)[0]['geometry a.u.']
+        geo_au = get_all_geometries(programs)[0]['geometry a.u.']
         geo = distance_AU_to_A(geo_au)
         geo = trim_non_atoms(geo)
 
+        # The geometry part of each line is the same for every mode
+        atom_prefix = [
+            "{:2} {:-9.6f} {:-9.6f} {:-9.6f}".format(xyz['Z-matrix Symbol'],
+                                                     *xyz['Coordinates'])
+            for xyz in geo
+        ]
+
+        # All modes list the atoms in the same order, check it only once
+        if len(normal_coordinates) > 0:
+            for xyz, vib in zip(geo, normal_coordinates[0]['coordinate']):
+                atom_symbol = xyz['Z-matrix Symbol']
+                if atom_symbol != vib['atomic symbol']:
+                    print(f"Warning! Mismatch between the geometry atoms order"
+                          f"and the vibrational atoms order in {atom_symbol}"
+                          f"and {vib['atomic symbol']}.", file=sys.stderr)
+
+        vib_line = " {:-8.5f} {:-8.5f} {:-8.5f}"
         for id, mode in enumerate(normal_coordinates):
             print_id = id
             if args.Mulliken is True:
                 print_id += 1
 
-            print(len(geo))
             comment = f"{str(print_id):>3s}. "
-            comment += f"{mode['kind'].title()} mode, "
+            comment += f"{mode['kind_title']} mode, "
             comment += f"{mode['frequency, cm-1']} cm-1, "
             comment += f"{mode['symmetry']}"
-            print(comment)
-
-            for xyz, vib in zip(geo, mode['coordinate']):
-                atom_symbol = xyz['Z-matrix Symbol']
-                if atom_symbol != vib['atomic symbol']:
-                    print(f"Warning! Mismatch between the geometry atoms order"
-                          f"and the vibrational atoms order in {atom_symbol}"
-                          f"and {vib['atomic symbol']}.", file=sys.stderr)
 
-                print(f"{atom_symbol:2}", end='')
-                for pos in xyz['Coordinates']:
-                    print(f" {pos:-9.6f}", end='')
-                for idx in ['x', 'y', 'z']:
-                    print(f" {vib[idx]:-8.5f}", end='')
-                print("")
+            body = "\n".join(
+                prefix + vib_line.format(vib['x'], vib['y'], vib['z'])
+                for prefix, vib in zip(atom_prefix, mode['coordinate'])
+            )
+            sys.stdout.write(f"{len(geo)}\n{comment}\n{body}\n")
 
 
 if __name__ == "__main__":
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import sys
+from collections import defaultdict
 from irrep_no_to_name import get_irrep_no_to_name
+from json_io import print_json
+from programs import SCF_RUNS, add_eager_argument, children, load_programs
 
 
 # Only terms in the root with amplitude larger than this values will get
@@ -12,6 +14,9 @@ from irrep_no_to_name import get_irrep_no_to_name
 SINGLE_THRESHOLD = 0.1
 DOUBLE_THRESHOLD = 0.1
 
+# Programs of the CFOUR output that are read by this script.
+PROGRAMS = {'xjoda', 'xncc', 'xvscf', 'xdqcscf'}
+
 
 def get_args():
     parser = argparse.ArgumentParser()
@@ -24,31 +29,28 @@ def get_args():
                         help="Print EOM roots as json.")
     parser.add_argument('-s', '--summary', default=0, action='count',
                         help="Print a summary of EOM roots.")
+    add_eager_argument(parser)
     args = parser.parse_args()
     return args
 
 
-def get_basis(cfour):
+def get_basis(programs):
     """ Extracts basis name from parsed CFOUR's output.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
     `basis`: a string represting the used basis set, in the same format as it
             appears in the CFOUR's listing of the control parameters
     """
 
-    for xjoda in cfour:
-        if xjoda['name'] == 'xjoda':
-            break
-
-    if xjoda['name'] != 'xjoda':
+    if 'xjoda' not in programs:
         print("Warning xjoda section missing.", file=sys.stderr)
         return
+    xjoda = programs['xjoda'][0]
 
-    for control_parameters in xjoda['sections']:
-        if control_parameters['name'] == 'control parameters':
-            break
-
-    if control_parameters['name'] != 'control parameters':
+    control_parameters = next(children(xjoda, 'control parameters'), None)
+    if control_parameters is None:
         print("Warning control parameters section missing.", file=sys.stderr)
         return
 
@@ -58,71 +60,65 @@ def get_basis(cfour):
     return basis
 
 
-def add_irrep_energy_no_and_name(roots: list, cfour):
+def add_irrep_energy_no_and_name(roots: list, programs):
     """
     Using the SCF listing add translation from the irrep number that CFOUR uses
     to the irrep name (e.g. Ag, or B3u).
 
     Additionally add the `energy #` keyword to each irrep. This number orders
     the states by their energy, but there is a separate counter for each irrep.
+
+    The roots have to be already sorted by their total energy (`add_root_ids`
+    does that).
     """
-    irrep_no_to_name = get_irrep_no_to_name(cfour)
+    irrep_no_to_name = get_irrep_no_to_name(programs)
 
-    roots.sort(key=lambda x: x['energy']['total']['au'])
-    energy_irrep = dict()
+    energy_irrep = defaultdict(int)
     for root in roots:
         irrep = root['irrep']
         number = irrep['#']
         name = irrep_no_to_name[number]
         irrep['name'] = name
-        if number in energy_irrep:
-            energy_irrep[number] += 1
-        else:
-            energy_irrep[number] = 1
+        energy_irrep[number] += 1
         irrep['energy #'] = energy_irrep[number]
 
 
-def get_scf_energy(cfour):
+def get_scf_energy(programs):
     """ Extracts SCF energy from parsed CFOUR's output.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
         `scf`: float() the SCF energy in au
     """
 
-    for scf_program in cfour:
-        if scf_program['name'] == 'xvscf' or scf_program['name'] == 'xdqcscf':
-            break
-
-    if scf_program['name'] != 'xvscf' and scf_program['name'] != 'xdqcscf':
+    scf_programs = programs.get(SCF_RUNS)
+    if scf_programs is None:
         print("Warning SCF program missing. Cannot extract SCF energy",
               file=sys.stderr)
         return
 
-    return scf_program['data']['energy']['au']
+    return scf_programs[0]['data']['energy']['au']
 
 
-def get_cc_data(cfour):
+def get_cc_data(programs):
     """ Extracts CC data from parsed CFOUR's output.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
         `cc`: a dictionary with coupled cluster data
                 "calclevel": CCSD|CCSDT|CCSDTQ
                 "cc_energy": total CC energy in au
     """
 
-    for xncc in cfour:
-        if xncc['name'] == 'xncc':
-            break
-
-    if xncc['name'] != 'xncc':
+    if 'xncc' not in programs:
         print("Error! xncc section was not found!", file=sys.stderr)
         return {}
+    xncc = programs['xncc'][0]
 
-    for cc in xncc['sections']:
-        if cc['name'] == 'cc':
-            break
-
-    if cc['name'] != 'cc':
+    cc = next(children(xncc, 'cc'), None)
+    if cc is None:
         print("Error! cc subsection of xncc was not found!", file=sys.stderr)
         return
 
@@ -134,43 +130,38 @@ def get_cc_data(cfour):
     return data
 
 
-def collect_eom_roots_xncc(cfour):
+def collect_eom_roots_xncc(programs):
     """ Extracts EOM roots data from parsed CFOUR's output.
+    `programs`: parsed CFOUR's output indexed with `index_programs`
     returns:
         roots: list()
     """
     roots = []
 
-    for xncc in cfour:
-        if xncc['name'] != 'xncc':
+    # Only the first xncc run is used
+    eom_roots = (
+        (eom_irrep, eom_root)
+        for xncc in programs.get('xncc', [])[:1]
+        for eom in children(xncc, 'eom')
+        for eom_irrep in children(eom, 'irrep')
+        for eom_root in children(eom_irrep, 'eom root')
+    )
+    for eom_irrep, eom_root in eom_roots:
+        root_data = {
+            subsection['name']: subsection['data']
+            for subsection in eom_root['sections']
+        }
+        if 'converged root' not in root_data or 'EOM energy' not in root_data:
+            print("Warning: Skipping an incomplete xncc EOM root.",
+                  file=sys.stderr)
             continue
-        for eom in xncc['sections']:
-            if eom['name'] != 'eom':
-                continue
-            for eom_irrep in eom['sections']:
-                if eom_irrep['name'] != 'irrep':
-                    continue
-                irrep_data = eom_irrep['data']
-                for eom_root in eom_irrep['sections']:
-                    if eom_root['name'] != 'eom root':
-                        continue
-                    eom_model = eom_root['data']['model']
-                    for eom_root_subsec in eom_root['sections']:
-                        if eom_root_subsec['name'] == 'converged root':
-                            converged_root = eom_root_subsec['data']
-                            continue
-
-                        if eom_root_subsec['name'] == 'EOM energy':
-                            root_energy = eom_root_subsec['data']
-                            continue
-
-                    roots += [{
-                        'model': eom_model,
-                        'irrep': dict(irrep_data),
-                        'converged root': converged_root,
-                        'energy': root_energy,
-                    }]
-        break
+
+        roots.append({
+            'model': eom_root['data']['model'],
+            'irrep': dict(eom_irrep['data']),
+            'converged root': root_data['converged root'],
+            'energy': root_data['EOM energy'],
+        })
 
     if len(roots) == 0:
         print("Info: No xncc EOM roots found.",
@@ -182,10 +173,10 @@ def collect_eom_roots_xncc(cfour):
 def print_cfour_excite_section(roots):
     """
     Prints the collected EOM roots as an input to the CFOUR's %excite* section
-    The roots are sorted by their total energy.
+    The roots have to be already sorted by their total energy (`add_root_ids`
+    does that).
     """
 
-    roots.sort(key=lambda x: x['energy']['total']['au'])
     n_roots = len(roots)
     print("%excite*")
     print(n_roots)
@@ -203,8 +194,10 @@ def print_eom_roots_summary(roots, print_lvl):
     """
     Presents a summary of collected eom roots that is helpful for the
     writing the excite section of another CFOUR's input.
+
+    The roots have to be already sorted by their total energy (`add_root_ids`
+    does that).
     """
-    roots.sort(key=lambda x: x['energy']['total']['au'])
     n_roots = len(roots)
     for root in roots:
         irrep_no = root['irrep']['#']
@@ -244,32 +237,34 @@ def print_eom_roots_summary(roots, print_lvl):
         print("\n")
 
 
-def print_eom_roots_for_CBS_fitting(roots, cfour):
+def print_eom_roots_for_CBS_fitting(roots, programs):
     """
     Presents a summary of collected eom roots that is helpful for the
     complte basis set extrapolation.
     """
 
-    basis = get_basis(cfour)
-    scf = get_scf_energy(cfour)
+    basis = get_basis(programs)
+    scf = get_scf_energy(programs)
     cbs_input = {
         'basis': basis,
         'scf': scf,
     }
-    cc = get_cc_data(cfour)
+    cc = get_cc_data(programs)
     cbs_input.update(cc)
-    cbs_input['EOM'] = list()
-    for root in roots:
-        cbs_input['EOM'] += [{
+    cbs_input['EOM'] = [
+        {
             'irrep': {
-                'name': root['irrep']['name'],
-                'energy #': root['irrep']['energy #'],
+                'name': irrep['name'],
+                'energy #': irrep['energy #'],
             },
             'energy': root['energy']['total']['au'],
             'model': root['model'],
-        }]
+        }
+        for root in roots
+        for irrep in (root['irrep'],)
+    ]
 
-    print(json.dumps(cbs_input))
+    print_json(cbs_input)
 
     return cbs_input
 
@@ -283,6 +278,9 @@ def add_root_ids(roots: list) -> None:
     when states are sorted in by their total energy.
 
     The ids are saved as a dictionary under the key 'ids' of the root.
+
+    The list is left sorted by the total energy of the roots. This is the only
+    place where the roots get sorted, the later steps rely on this order.
     """
     for counter, root in enumerate(roots):
         root['ids'] = {'#': counter}
@@ -294,21 +292,20 @@ def add_root_ids(roots: list) -> None:
 
 def main():
     args = get_args()
-    with open(args.cfour_file, 'r') as cfour_file_input:
-        cfour = json.load(cfour_file_input)
+    programs = load_programs(args.cfour_file, PROGRAMS, args.eager)
 
-    roots = collect_eom_roots_xncc(cfour)
+    roots = collect_eom_roots_xncc(programs)
     add_root_ids(roots)
-    add_irrep_energy_no_and_name(roots, cfour)
+    add_irrep_energy_no_and_name(roots, programs)
 
     if args.cbs is True:
-        print_eom_roots_for_CBS_fitting(roots, cfour)
+        print_eom_roots_for_CBS_fitting(roots, programs)
 
     if args.excite is True:
         print_cfour_excite_section(roots)
 
     if args.json is True:
-        print(json.dumps(roots))
+        print_json(roots)
 
     if args.summary > 0:
         print_eom_roots_summary(roots, args.summary)
@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 
 import argparse
-import json
 import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from operator import attrgetter
 from irrep_no_to_name import get_irrep_no_to_name
+from json_io import print_json
+from programs import SCF_RUNS, add_eager_argument, children, load_programs
 
 au2eV = 27.211386245988
 
@@ -13,6 +17,59 @@ au2eV = 27.211386245988
 SINGLE_THRESHOLD = 0.1
 DOUBLE_THRESHOLD = 0.1
 
+# Programs of the CFOUR output that are read by this script.
+PROGRAMS = {'xjoda', 'xvscf', 'xdqcscf', 'xncc', 'xvee', 'xvcc'}
+
+
+@dataclass(slots=True)
+class Root:
+    """
+    EOM root collected from xvee.
+
+    The raw `irrep` and `energy` data of the `eom solution` are kept as they
+    are, the fields used by this script are copied out of them. The fields
+    that are `None` are filled later by the `add_*` functions, except for
+    `converged_root`, which stays `None` until the parser provides the
+    converged root section of xvee. `to_dict` leaves it out.
+    """
+    model: str
+    irrep_no: int
+    total_au: float
+    irrep_data: dict
+    energy_data: dict
+    irrep_name: str | None = None
+    irrep_energy_no: int | None = None
+    excitation_au: float | None = None
+    excitation_eV: float | None = None
+    id_no: int | None = None
+    energy_id: int | None = None
+    converged_root: dict | None = None
+
+    def to_dict(self) -> dict:
+        """ Returns the root in the nested layout of the parsed CFOUR output.
+        """
+        irrep = dict(self.irrep_data)
+        if self.irrep_name is not None:
+            irrep['name'] = self.irrep_name
+            irrep['energy #'] = self.irrep_energy_no
+
+        energy = dict(self.energy_data)
+        if self.excitation_au is not None:
+            energy['excitation'] = {
+                'au': self.excitation_au,
+                'eV': self.excitation_eV,
+            }
+
+        root = {
+            'model': self.model,
+            'irrep': irrep,
+            'energy': energy,
+        }
+        if self.id_no is not None:
+            root['ids'] = {'#': self.id_no, 'energy #': self.energy_id}
+
+        return root
+
 
 def get_args():
     parser = argparse.ArgumentParser()
@@ -25,31 +82,28 @@ def get_args():
                         help="Print EOM roots as json.")
     parser.add_argument('-s', '--summary', default=0, action='count',
                         help="Print a summary of EOM roots.")
+    add_eager_argument(parser)
     args = parser.parse_args()
     return args
 
 
-def get_basis(cfour):
+def get_basis(programs):
     """ Extracts basis name from parsed CFOUR's output.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
     `basis`: a string represting the used basis set, in the same format as it
             appears in the CFOUR's listing of the control parameters
     """
 
-    for xjoda in cfour:
-        if xjoda['name'] == 'xjoda':
-            break
-
-    if xjoda['name'] != 'xjoda':
+    if 'xjoda' not in programs:
         print("Warning xjoda section missing.", file=sys.stderr)
         return
+    xjoda = programs['xjoda'][0]
 
-    for control_parameters in xjoda['sections']:
-        if control_parameters['name'] == 'control parameters':
-            break
-
-    if control_parameters['name'] != 'control parameters':
+    control_parameters = next(children(xjoda, 'control parameters'), None)
+    if control_parameters is None:
         print("Warning control parameters section missing.", file=sys.stderr)
         return
 
@@ -59,73 +113,64 @@ def get_basis(cfour):
     return basis
 
 
-def add_irrep_energy_no_and_name(roots, cfour):
-    irrep_no_to_name = get_irrep_no_to_name(cfour)
+def add_irrep_energy_no_and_name(roots, programs):
+    """
+    The roots have to be already sorted by their total energy (`add_root_ids`
+    does that).
+    """
+    irrep_no_to_name = get_irrep_no_to_name(programs)
 
-    roots.sort(key=lambda x: x['energy']['total']['au'])
-    energy_irrep = dict()
+    energy_irrep = defaultdict(int)
     for root in roots:
-        irrep = root['irrep']
-        number = irrep['#']
-        name = irrep_no_to_name[number]
-        irrep['name'] = name
-        if number in energy_irrep:
-            energy_irrep[number] += 1
-        else:
-            energy_irrep[number] = 1
-        irrep['energy #'] = energy_irrep[number]
+        number = root.irrep_no
+        root.irrep_name = irrep_no_to_name[number]
+        energy_irrep[number] += 1
+        root.irrep_energy_no = energy_irrep[number]
 
 
 def add_excitation_energy(roots, cc_energy_au: float):
     for root in roots:
-        excitation_energy_au = root['energy']['total']['au'] - cc_energy_au
-        root['energy']['excitation'] = {
-            'au': excitation_energy_au,
-            'eV': excitation_energy_au * au2eV,
-        }
+        excitation_energy_au = root.total_au - cc_energy_au
+        root.excitation_au = excitation_energy_au
+        root.excitation_eV = excitation_energy_au * au2eV
 
 
-def get_scf_energy(cfour):
+def get_scf_energy(programs):
     """ Extracts SCF energy from parsed CFOUR's output.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
         `scf`: float() the SCF energy in au
     """
 
-    for scf_program in cfour:
-        if scf_program['name'] == 'xvscf' or scf_program['name'] == 'xdqcscf':
-            break
-
-    if scf_program['name'] != 'xvscf' and scf_program['name'] != 'xdqcscf':
+    scf_programs = programs.get(SCF_RUNS)
+    if scf_programs is None:
         print("Warning SCF program missing. Cannot extract SCF energy",
               file=sys.stderr)
         return
 
-    return scf_program['data']['energy']['au']
+    return scf_programs[0]['data']['energy']['au']
 
 
-def get_cc_data(cfour):
+def get_cc_data(programs):
     """ Extracts CC data from parsed CFOUR's output.
 
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+
     Returns:
         `cc`: a dictionary with coupled cluster data
                 "calclevel": CCSD|CCSDT|CCSDTQ
                 "cc_energy": total CC energy in au
     """
 
-    for xncc in cfour:
-        if xncc['name'] == 'xncc':
-            break
-
-    if xncc['name'] != 'xncc':
+    if 'xncc' not in programs:
         print("Error! xncc section was not found!", file=sys.stderr)
         return
+    xncc = programs['xncc'][0]
 
-    for cc in xncc['sections']:
-        if cc['name'] == 'cc':
-            break
-
-    if cc['name'] != 'cc':
+    cc = next(children(xncc, 'cc'), None)
+    if cc is None:
         print("Error! cc subsection of xncc was not found!", file=sys.stderr)
         return
 
@@ -137,20 +182,17 @@ def get_cc_data(cfour):
     return data
 
 
-def collect_eom_roots_xvee(cfour):
+def collect_eom_roots_xvee(programs):
     """ Extracts EOM roots data from parsed CFOUR's output.
+    `programs`: parsed CFOUR's output indexed with `index_programs`
     returns:
-        roots: list()
+        roots: list[Root]
     """
     roots = []
 
-    for xvee in cfour:
-        if xvee['name'] != 'xvee':
-            continue
-        for solution in xvee['sections']:
-            if solution['name'] != 'eom solution':
-                continue
-
+    # Only the first xvee run is used
+    for xvee in programs.get('xvee', [])[:1]:
+        for solution in children(xvee, 'eom solution'):
             # TODO: move the metadata test to a separate module
             if solution['metadata']['ok'] is False:
                 if 'start' in solution:
@@ -168,17 +210,15 @@ def collect_eom_roots_xvee(cfour):
                       file=sys.stderr)
                 continue
 
-            eom_model = solution['data']['model']
-            root_energy = solution['data']['energy']
-            irrep = solution['data']['irrep']
-
-            roots += [{
-                'model': eom_model,
-                'irrep': irrep,
-                'energy': root_energy,
-            }]
-
-        break
+            data = solution['data']
+            roots.append(Root(
+                model=data['model'],
+                irrep_no=data['irrep']['#'],
+                total_au=data['energy']['total']['au'],
+                irrep_data=data['irrep'],
+                energy_data=data['energy'],
+                converged_root=data.get('converged root'),
+            ))
 
     if len(roots) == 0:
         print("Info: No xvee EOM roots found.", file=sys.stderr)
@@ -189,100 +229,104 @@ def collect_eom_roots_xvee(cfour):
 def print_cfour_excite_section(roots):
     """
     Prints the collected EOM roots as an input to the CFOUR's %excite* section
-    The roots are sorted by their total energy.
+    The roots have to be already sorted by their total energy (`add_root_ids`
+    does that).
     """
 
-    roots.sort(key=lambda x: x['energy']['total']['au'])
     n_roots = len(roots)
-    print("%excite*")
-    print(n_roots)
+    single_line = "1 {} 0 {} 0 {:.3f}".format
+    out = ["%excite*", str(n_roots)]
     for root in roots:
-        singles = [single for single in root['converged root']['singles'] if
+        singles = [single for single in root.converged_root['singles'] if
                    abs(single['amplitude']) > SINGLE_THRESHOLD]
-        n_singles = len(singles)
-        print(f"{n_singles}")
+        out.append(str(len(singles)))
         for single in singles:
-            print(f"1 {single['I']} 0 {single['A']} 0 "
-                  f"{single['amplitude']:.3f}")
+            out.append(single_line(single['I'], single['A'],
+                                   single['amplitude']))
+
+    sys.stdout.write('\n'.join(out) + '\n')
 
 
 def print_eom_roots_summary(roots, print_lvl):
     """
     Presents a summary of collected eom roots that is helpful for the
     writing the excite section of another CFOUR's input.
+
+    The roots have to be already sorted by their total energy (`add_root_ids`
+    does that).
     """
-    roots.sort(key=lambda x: x['energy']['total']['au'])
     n_roots = len(roots)
+    root_line = ("{:2}: Root {:2d}/{}: {} {:3} (irrep #{}): "
+                 "{:6.3f} eV ({:6.3f} Ha).").format
+    single_line = "1 {} 0 {} 0 {:.3f}".format
+    double_line = "{} {} {} {} {:.3f}".format
+    out = []
     for root in roots:
-        irrep_no = root['irrep']['#']
-        irrep_energy_no = root['irrep']['energy #']
-        irrep_name = root['irrep']['name']
-        id = root['ids']['#']
-        energy_id = root['ids']['energy #']
-        print(f"{id:2}: Root {energy_id+1:2d}/{n_roots}: "
-              f"{irrep_energy_no} {irrep_name:3} (irrep #{irrep_no}): "
-              f"{root['energy']['excitation']['eV']:6.3f} eV"
-              f" ({root['energy']['total']['au']:6.3f} Ha).")
+        out.append(root_line(root.id_no, root.energy_id + 1, n_roots,
+                             root.irrep_energy_no, root.irrep_name,
+                             root.irrep_no, root.excitation_eV,
+                             root.total_au))
 
         # Print singles only with double flag
         if print_lvl < 2:
             continue
 
         # TODO: not available for xvee
-        print("TODO: only basic printout is available so far for xvee.")
+        out.append("TODO: only basic printout is available so far for xvee.")
         continue
 
-        print("Singles:")
-        singles = [single for single in root['converged root']['singles'] if
+        out.append("Singles:")
+        singles = [single for single in root.converged_root['singles'] if
                    abs(single['amplitude']) > SINGLE_THRESHOLD]
-        n_singles = len(singles)
-        print(f"{n_singles}")
+        out.append(str(len(singles)))
         for single in singles:
-            print(f"1 {single['I']} 0 {single['A']} 0 "
-                  f"{single['amplitude']:.3f}")
+            out.append(single_line(single['I'], single['A'],
+                                   single['amplitude']))
 
         # Print doubles only with triple flag
         if print_lvl < 3:
             continue
-        print("Doubles:")
-        doubles = [double for double in root['converged root']['doubles'] if
+        out.append("Doubles:")
+        doubles = [double for double in root.converged_root['doubles'] if
                    abs(double['amplitude']) > DOUBLE_THRESHOLD]
-        n_doubles = len(doubles)
-        print(f"{n_doubles}")
+        out.append(str(len(doubles)))
         for double in doubles:
-            print(f"{double['I']} {double['J']} {double['A']} {double['B']} "
-                  f"{double['amplitude']:.3f}")
+            out.append(double_line(double['I'], double['J'], double['A'],
+                                   double['B'], double['amplitude']))
+
+        out.append("\n")
 
-        print("\n")
+    if len(out) > 0:
+        sys.stdout.write('\n'.join(out) + '\n')
 
 
-def print_eom_roots_for_CBS_fitting(roots, cfour):
+def print_eom_roots_for_CBS_fitting(roots, programs):
     """
     Presents a summary of collected eom roots that is helpful for the
     complte basis set extrapolation.
     """
 
-    basis = get_basis(cfour)
-    scf = get_scf_energy(cfour)
+    basis = get_basis(programs)
+    scf = get_scf_energy(programs)
     cbs_input = {
         'basis': basis,
         'scf': scf,
     }
     # TODO: get_cc_data works only with xncc
-    cc = get_cc_data(cfour)
+    cc = get_cc_data(programs)
     cbs_input.update(cc)
     cbs_input['EOM'] = list()
     for root in roots:
-        cbs_input['EOM'] += [{
+        cbs_input['EOM'].append({
             'irrep': {
-                'name': root['irrep']['name'],
-                'energy #': root['irrep']['energy #'],
+                'name': root.irrep_name,
+                'energy #': root.irrep_energy_no,
             },
-            'energy': root['energy']['total']['au'],
-            'model': root['model'],
-        }]
+            'energy': root.total_au,
+            'model': root.model,
+        })
 
-    print(json.dumps(cbs_input))
+    print_json(cbs_input)
 
     return cbs_input
 
@@ -290,39 +334,36 @@ def print_eom_roots_for_CBS_fitting(roots, cfour):
 # TODO: this function is shared with print_roots for xncc make is a library.
 def add_root_ids(roots):
     """
-    For each root in the list add an ordering number '#' that does not
+    For each root in the list add an ordering number `id_no` that does not
     correspond to anything but it a unique number assigned to each root.
 
-    For each root assigned also the 'energy #', which tells which orders the
+    For each root assigned also the `energy_id`, which tells which orders the
     states by their energy.
 
-    The ids are saved as a dictionary under the key 'ids' of the root.
+    The list is left sorted by the total energy of the roots. This is the only
+    place where the roots get sorted, the later steps rely on this order.
 
     Input:
-        roots: list()
+        roots: list[Root]
     """
     for counter, root in enumerate(roots):
-        root['ids'] = {'#': counter}
+        root.id_no = counter
 
-    roots.sort(key=lambda x: x['energy']['total']['au'])
+    roots.sort(key=attrgetter('total_au'))
     for counter, root in enumerate(roots):
-        root['ids']['energy #'] = counter
+        root.energy_id = counter
 
 
-def collect_ccsd(cfour) -> list[float]:
+def collect_ccsd(programs) -> list[float]:
     """ Extract total CC energy from every xvcc program run.
+    `programs`: parsed CFOUR's output indexed with `index_programs`
     returns:
         roots: list[float]
     """
     cc_total_energies_au = []
 
-    for xvcc in cfour:
-        if xvcc['name'] != 'xvcc':
-            continue
-        for miracle in xvcc['sections']:
-            if miracle['name'] != 'A miracle':
-                continue
-
+    for xvcc in programs.get('xvcc', []):
+        for miracle in children(xvcc, 'A miracle'):
             # TODO: move the metadata test to a separate module
             if miracle['metadata']['ok'] is False:
                 if 'start' in miracle:
@@ -341,7 +382,7 @@ def collect_ccsd(cfour) -> list[float]:
                 continue
 
             cc_total_energy_au = miracle['data']['energy']['total']['au']
-            cc_total_energies_au += [cc_total_energy_au]
+            cc_total_energies_au.append(cc_total_energy_au)
 
     if len(cc_total_energies_au) == 0:
         print("Info: No CC total energies found in xvcc.", file=sys.stderr)
@@ -351,20 +392,19 @@ def collect_ccsd(cfour) -> list[float]:
 
 def main():
     args = get_args()
-    with open(args.cfour_file, 'r') as cfour_file_input:
-        cfour = json.load(cfour_file_input)
+    programs = load_programs(args.cfour_file, PROGRAMS, args.eager)
 
-    cc_energies = collect_ccsd(cfour)
-    roots = collect_eom_roots_xvee(cfour)
+    cc_energies = collect_ccsd(programs)
+    roots = collect_eom_roots_xvee(programs)
     add_root_ids(roots)
-    add_irrep_energy_no_and_name(roots, cfour)
+    add_irrep_energy_no_and_name(roots, programs)
     add_excitation_energy(roots, cc_energies[0])
 
     # TODO: implement xvcc parsing from xvcc
     # TODO: xvcc is ready!
     if args.cbs is True:
         print("TODO: implement cc parsing for xvcc", file=sys.stderr)
-        # print_eom_roots_for_CBS_fitting(roots, cfour)
+        # print_eom_roots_for_CBS_fitting(roots, programs)
 
     # TODO: implement parsing of converged root section of xvee
     if args.excite is True:
@@ -373,7 +413,7 @@ def main():
         # print_cfour_excite_section(roots)
 
     if args.json is True:
-        print(json.dumps(roots))
+        print_json([root.to_dict() for root in roots])
 
     if args.summary > 0:
         print_eom_roots_summary(roots, args.summary)
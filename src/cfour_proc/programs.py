@@ -0,0 +1,127 @@
+import sys
+from json_io import load_json
+
+# ijson allows to read only the needed programs from large parsed CFOUR
+# outputs, but it is optional. Without it the whole file is loaded.
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Programs that do the SCF, either of them can appear in the output.
+SCF_PROGRAMS = ('xvscf', 'xdqcscf')
+# The index keeps the runs of all the SCF programs also under this key, in
+# the order in which they appear in the output.
+SCF_RUNS = 'SCF runs'
+
+
+def index_programs(cfour) -> dict[str, list[dict]]:
+    """
+    `cfour`: parsed CFOUR's output
+
+    Returns:
+        programs: a dictionary that keeps program names (e.g. 'xjoda') as
+        keys and lists of all runs of that program as values. Every list keeps
+        the runs in the order in which they appear in the output.
+
+        The runs of all `SCF_PROGRAMS` are listed also under `SCF_RUNS`.
+    """
+    programs = dict()
+    for program in cfour:
+        # The scripts look the programs up with literals like 'xjoda', which
+        # Python interns. Interned keys are the same objects, so the lookups
+        # do not have to compare the strings character by character.
+        name = sys.intern(program['name'])
+        programs.setdefault(name, []).append(program)
+        if name in SCF_PROGRAMS:
+            programs.setdefault(SCF_RUNS, []).append(program)
+
+    return programs
+
+
+def children(program, name):
+    """
+    `program`: a program (or a section) from parsed CFOUR's output
+
+    Yields, in order, the subsections of `program` called `name`. Use
+    `next(children(program, name), None)` when only the first one is needed.
+    """
+    for section in program.get('sections', []):
+        if section['name'] == name:
+            yield section
+
+
+def collect_point_group(programs, warn=True) -> str:
+    """
+    Extracts the computational point group.
+
+    `programs`: parsed CFOUR's output indexed with `index_programs`
+    `warn`: print the errors to the standard error
+
+    Returns:
+        point_group (str): Computational point group listed in the first xjoda.
+        Returns empty string if error.
+    """
+    if 'xjoda' not in programs:
+        if warn is True:
+            print("Error: xjoda section is missing. Cannot get point group.",
+                  file=sys.stderr)
+        return ""
+    first_xjoda = programs['xjoda'][0]
+
+    point_group = None
+    for section in children(first_xjoda, 'point group'):
+        if section['metadata']['ok'] is False and warn is True:
+            print("Error: Point group section of xjoda is corrupted."
+                  "Point group might be invalid.",
+                  file=sys.stderr)
+
+        data = section['data']
+        if 'computational point group' in data:
+            point_group = data['computational point group']
+
+    if point_group is None:
+        if warn is True:
+            print("Error: Cannot collect the point group from xjoda.",
+                  file=sys.stderr)
+        point_group = ""
+
+    return point_group
+
+
+def stream_programs(path, names):
+    """
+    Yields, in order, the programs of the parsed CFOUR's output `path` whose
+    name is listed in `names`. Requires ijson.
+
+    Only one program at a time is built in memory, the ones not listed in
+    `names` are dropped right after they are read.
+    """
+    with open(path, 'rb') as cfour_file:
+        for program in ijson.items(cfour_file, 'item', use_float=True):
+            if program['name'] in names:
+                yield program
+
+
+def add_eager_argument(parser) -> None:
+    """ Adds the `--eager` flag of `load_programs` to the argparse `parser`.
+    """
+    parser.add_argument('--eager', default=False, action='store_true',
+                        help="Load the whole CFOUR output instead of reading"
+                        " only the programs used by this script.")
+
+
+def load_programs(path, names, eager=False) -> dict[str, list[dict]]:
+    """
+    Reads the parsed CFOUR's output `path` and indexes it with
+    `index_programs`.
+
+    By default only the programs listed in `names` are read. With `eager`, or
+    when ijson is not installed, the whole file is loaded. The pure Python
+    backend of ijson is much slower than loading the whole file, so the file
+    is loaded also then.
+    """
+    if eager is True or ijson is None or ijson.backend == 'python':
+        return index_programs(load_json(path))
+
+    return index_programs(stream_programs(path, names))